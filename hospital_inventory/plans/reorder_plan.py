@@ -130,16 +130,58 @@
 
 import pandas as pd
 import numpy as np
-from sklearn.linear_model import LinearRegression
-from prophet import Prophet
+import hashlib
+import operator
+from collections import defaultdict
+from collections.abc import MutableMapping
+from functools import lru_cache
 from adk.planner import BasePlan
 from typing import Dict, Any, List
 
+# Key under which Prophet forecasts are kept when the ADK memory is a mapping.
+# The value is JSON-safe: {item_id: {"key": str, "forecast": float}}.
+PROPHET_FORECASTS_KEY = "reorder_plan_prophet_forecasts"
+
+
+@lru_cache(maxsize=1)
+def _get_prophet():
+    """
+    Import Prophet on first use. It drags in cmdstanpy and friends and takes
+    seconds to load, so callers that never forecast a long history don't pay
+    for it. Returns None if Prophet isn't installed; the result is cached so
+    the import is only attempted once.
+    """
+    try:
+        from prophet import Prophet
+    except ImportError:
+        return None
+    return Prophet
+
+
+def _linreg_predict_means(Y: np.ndarray, forecast_weeks: int) -> np.ndarray:
+    """
+    Closed-form least-squares fit of every row of Y (shape (k, n)) against
+    x = 0..n-1, returning each row's mean prediction over the next
+    `forecast_weeks` points. All k rows are fitted with one matrix-vector
+    product instead of one regression object per item.
+    """
+    n = Y.shape[1]
+    x = np.arange(n, dtype=np.float64)
+    x_mean = x.mean()
+    xc = x - x_mean
+    denom = xc @ xc
+    # xc sums to zero, so Y @ xc equals the centred covariance term.
+    slopes = (Y @ xc) / denom if denom > 0 else np.zeros(Y.shape[0])
+    intercepts = Y.mean(axis=1) - slopes * x_mean
+    # A line's mean over x = n..n+forecast_weeks-1 is its value at the midpoint.
+    return slopes * (n + (forecast_weeks - 1) / 2) + intercepts
+
 
 class ReorderPlan(BasePlan):
     name = "ReorderPlan"
     description = (
-        "Forecasts demand using Prophet (with Linear Regression fallback) and returns reorder suggestions. "
+        "Forecasts demand using Prophet for long usage histories (Linear Regression otherwise, or on failure) "
+        "and returns reorder suggestions. "
         "Adds criticality scoring, demand classification, and depletion monitoring."
     )
 
@@ -149,10 +191,35 @@ class ReorderPlan(BasePlan):
             raise ValueError("Missing required tool: inventory_db_tool")
 
         inventory_list = db_tool.get_stock()
+        # Whole integers only: operator.index rejects floats and numeric strings
+        # instead of truncating them, and bools are refused explicitly.
         forecast_weeks = kwargs.get("forecast_weeks", 1)
+        try:
+            forecast_weeks = 0 if isinstance(forecast_weeks, bool) else operator.index(forecast_weeks)
+        except TypeError:
+            forecast_weeks = 0
+        if forecast_weeks < 1:
+            self._log(f"Invalid forecast_weeks {kwargs.get('forecast_weeks')!r}; expected an integer >= 1.", memory)
+            return {"reorder_suggestions": []}
         min_required_history = kwargs.get("min_history", 7)
+        # Below this many points Prophet is slower and no more accurate than
+        # the linear fit, so it is skipped entirely.
+        prophet_min_history = kwargs.get("prophet_min_history", 30)
+        # Reference date for every item's history, taken once per run
+        today = pd.Timestamp.today().normalize()
+        # Prophet forecasts from earlier runs, read from memory so repeated runs
+        # skip re-fitting unchanged histories. Only items forecast by Prophet in
+        # this run are written back, so items that left the inventory drop out.
+        previous_forecasts = self._load_prophet_forecasts(memory)
+        prophet_forecasts: Dict[str, Dict[str, Any]] = {}
 
         reorder_suggestions: List[Dict[str, Any]] = []
+        # Items that passed the history check, in inventory order. Each entry
+        # carries its usage array and either a Prophet forecast or None.
+        forecasts: List[Dict[str, Any]] = []
+        # Items needing the linear-regression fallback, bucketed by history
+        # length so each bucket is fitted in one vectorized pass.
+        linreg_buckets: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
 
         for item in inventory_list:
             try:
@@ -162,20 +229,25 @@ class ReorderPlan(BasePlan):
                 threshold = int(item.get("reorder_threshold", 0))
                 usage_history = item.get("usage_history", [])
 
-                usage_series = pd.Series(usage_history).dropna()
-                usage_series = usage_series[usage_series >= 0]
-
-                if len(usage_series) < min_required_history:
+                # Drop missing (None/NaN) and negative readings. Strings are
+                # rejected rather than coerced, so numeric text like "3" makes
+                # the item error out and be skipped, as with the old pd.Series.
+                raw = np.asarray(usage_history)
+                if raw.dtype.kind in "USa" or (
+                    raw.dtype.kind == "O" and any(isinstance(v, (str, bytes)) for v in raw.flat)
+                ):
+                    raise TypeError("usage_history contains non-numeric entries")
+                usage = raw.astype(np.float64)
+                usage = usage[~np.isnan(usage) & (usage >= 0)]
+
+                if usage.size < min_required_history:
                     self._log(f"Skipping '{item_name}' (ID: {item_id}) — insufficient usage history.", memory)
                     continue
 
-                # Create historical time series
-                today = pd.Timestamp.today().normalize()
-                dates = [today - pd.Timedelta(weeks=i) for i in range(len(usage_series)-1, -1, -1)]
-                df = pd.DataFrame({"ds": dates, "y": usage_series.values})
+                mean_usage = usage.mean()
 
                 # Demand classification
-                total_usage = usage_series.sum()
+                total_usage = usage.sum()
                 if total_usage > 100:
                     demand_class = "fast-moving"
                 elif total_usage > 30:
@@ -184,8 +256,8 @@ class ReorderPlan(BasePlan):
                     demand_class = "slow-moving"
 
                 # Depletion rate (last 3 weeks avg)
-                recent_avg = usage_series.tail(3).mean()
-                depletion_flag = recent_avg > usage_series.mean() * 1.5  # e.g. 50% spike
+                recent_avg = usage[-3:].mean()
+                depletion_flag = recent_avg > mean_usage * 1.5  # e.g. 50% spike
 
                 # Criticality scoring (simplified — in real cases, link to item metadata)
                 if "syringe" in item_name.lower() or "emergency" in item_name.lower():
@@ -195,22 +267,81 @@ class ReorderPlan(BasePlan):
                 else:
                     criticality = "low"
 
-                # Forecasting with Prophet
-                try:
-                    model = Prophet(weekly_seasonality=True, daily_seasonality=False, yearly_seasonality=False)
-                    model.fit(df)
-                    future = model.make_future_dataframe(periods=forecast_weeks, freq="W")
-                    forecast = model.predict(future)
-                    predicted_usage = forecast["yhat"].iloc[-forecast_weeks:].mean()
-                except Exception as e:
-                    self._log(f"Prophet failed for {item_name}. Falling back to Linear Regression. {e}", memory)
-                    X = np.arange(len(usage_series)).reshape(-1, 1)
-                    y = usage_series.values
-                    linreg = LinearRegression().fit(X, y)
-                    X_pred = np.arange(len(usage_series), len(usage_series) + forecast_weeks).reshape(-1, 1)
-                    predicted_usage = linreg.predict(X_pred).mean()
-
-                predicted_usage = max(int(round(predicted_usage)), 0)
+                entry = {
+                    "item_id": item_id,
+                    "name": item_name,
+                    "current_quantity": current_qty,
+                    "reorder_threshold": threshold,
+                    "demand_classification": demand_class,
+                    "criticality": criticality,
+                    "depletion_rate_spike": depletion_flag,
+                    "usage": usage,
+                    "mean_usage": mean_usage,
+                    "predicted_usage": None,
+                }
+
+                # Forecasting with Prophet (long histories only)
+                if usage.size < prophet_min_history or _get_prophet() is None:
+                    linreg_buckets[usage.size].append(entry)
+                else:
+                    history_key = (
+                        f"{hashlib.sha256(usage.tobytes()).hexdigest()}"
+                        f":{forecast_weeks}:{today.date().isoformat()}"
+                    )
+                    cached = previous_forecasts.get(item_id)
+                    if (
+                        isinstance(cached, dict)
+                        and cached.get("key") == history_key
+                        and isinstance(cached.get("forecast"), (int, float))
+                    ):
+                        entry["predicted_usage"] = cached["forecast"]
+                        prophet_forecasts[item_id] = cached
+                    else:
+                        try:
+                            # Weekly history ending today; only built when Prophet runs
+                            df = pd.DataFrame({
+                                "ds": pd.date_range(end=today, periods=usage.size, freq="7D"),
+                                "y": usage,
+                            })
+                            Prophet = _get_prophet()
+                            model = Prophet(weekly_seasonality=True, daily_seasonality=False, yearly_seasonality=False)
+                            model.fit(df)
+                            future = model.make_future_dataframe(periods=forecast_weeks, freq="W")
+                            forecast = model.predict(future)
+                            entry["predicted_usage"] = forecast["yhat"].iloc[-forecast_weeks:].mean()
+                            prophet_forecasts[item_id] = {
+                                "key": history_key,
+                                "forecast": float(entry["predicted_usage"]),
+                            }
+                        except Exception as e:
+                            self._log(f"Prophet failed for {item_name}. Falling back to Linear Regression. {e}", memory)
+                            linreg_buckets[usage.size].append(entry)
+
+                forecasts.append(entry)
+
+            except Exception as e:
+                self._log(f"Error processing item {item.get('name', '')} (ID: {item.get('item_id', '')}): {e}", memory)
+                continue
+
+        # Linear Regression fallback: one batched fit per history length
+        for bucket in linreg_buckets.values():
+            try:
+                predictions = _linreg_predict_means(np.stack([e["usage"] for e in bucket]), forecast_weeks)
+            except Exception as e:
+                # Leave these items without a forecast; they are skipped below
+                for entry in bucket:
+                    self._log(f"Error processing item {entry['name']} (ID: {entry['item_id']}): {e}", memory)
+                continue
+            for entry, prediction in zip(bucket, predictions):
+                entry["predicted_usage"] = prediction
+
+        for entry in forecasts:
+            if entry["predicted_usage"] is None:
+                continue
+            try:
+                current_qty = entry["current_quantity"]
+                threshold = entry["reorder_threshold"]
+                predicted_usage = max(int(round(entry["predicted_usage"])), 0)
                 projected_remaining = current_qty - predicted_usage
 
                 if projected_remaining < threshold:
@@ -218,25 +349,46 @@ class ReorderPlan(BasePlan):
                     reorder_qty = max(reorder_qty, 0)
 
                     reorder_suggestions.append({
-                        "item_id": item_id,
-                        "name": item_name,
+                        "item_id": entry["item_id"],
+                        "name": entry["name"],
                         "current_quantity": current_qty,
                         "predicted_next_week_usage": predicted_usage,
                         "projected_remaining": projected_remaining,
                         "reorder_threshold": threshold,
                         "suggested_reorder_quantity": reorder_qty,
-                        "demand_classification": demand_class,
-                        "criticality": criticality,
-                        "depletion_rate_spike": depletion_flag,
-                        "confidence": round(float(predicted_usage / (usage_series.mean() + 1e-5)), 2)
+                        "demand_classification": entry["demand_classification"],
+                        "criticality": entry["criticality"],
+                        "depletion_rate_spike": entry["depletion_rate_spike"],
+                        "confidence": round(float(predicted_usage / (entry["mean_usage"] + 1e-5)), 2)
                     })
 
             except Exception as e:
-                self._log(f"Error processing item {item.get('name', '')} (ID: {item.get('item_id', '')}): {e}", memory)
+                self._log(f"Error processing item {entry['name']} (ID: {entry['item_id']}): {e}", memory)
                 continue
 
+        self._store_prophet_forecasts(memory, prophet_forecasts)
         return {"reorder_suggestions": reorder_suggestions}
 
+    def _load_prophet_forecasts(self, memory: Any) -> Dict[str, Dict[str, Any]]:
+        # Only mapping-like memory is used; other memory objects belong to the
+        # framework and get no extra attributes, so forecasts aren't reused.
+        if not isinstance(memory, MutableMapping):
+            return {}
+        try:
+            cached = memory.get(PROPHET_FORECASTS_KEY)
+        except Exception:
+            return {}
+        return cached if isinstance(cached, dict) else {}
+
+    def _store_prophet_forecasts(self, memory: Any, forecasts: Dict[str, Dict[str, Any]]):
+        if not isinstance(memory, MutableMapping):
+            return
+        try:
+            memory[PROPHET_FORECASTS_KEY] = forecasts
+        except Exception as e:
+            # Caching must never change what run() returns
+            self._log(f"Could not store Prophet forecasts in memory: {e}", memory)
+
     def _log(self, message: str, memory: Any = None):
         print(f"[ReorderPlan] {message}")
         if memory and hasattr(memory, "add_log"):
@@ -7,8 +7,11 @@
 # =========================================
 
 from adk.tools import BaseTool
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Dict, Any
+import numpy as np
+
+_INT64_MIN, _INT64_MAX = int(np.iinfo(np.int64).min), int(np.iinfo(np.int64).max)
 
 class InventoryDBTool(BaseTool):
     """
@@ -54,6 +57,27 @@ class InventoryDBTool(BaseTool):
             },
             # Add more items as needed...
         ]
+        # Index of item_id -> position in _inventory (and in the columns
+        # below), so lookups by ID don't scan the whole list. This is the only
+        # ID map; any future add/remove method must update it together with
+        # _inventory and the columns.
+        self._id_to_pos: Dict[str, int] = {
+            item["item_id"]: pos for pos, item in enumerate(self._inventory)
+        }
+
+        # Column-wise copies of the fields the list_* filters compare, aligned
+        # with _inventory by position, so those filters run as single NumPy
+        # comparisons instead of a Python loop over dicts. update_stock and
+        # record_usage keep _qty in sync; quantities must be changed through
+        # those methods rather than by mutating the dicts from get_stock().
+        self._qty = np.array([item["quantity"] for item in self._inventory], dtype=np.int64)
+        self._threshold = np.array(
+            [item["reorder_threshold"] for item in self._inventory], dtype=np.int64
+        )
+        self._expiry = np.array(
+            [np.datetime64(item["expiry_date"].date()) for item in self._inventory],
+            dtype="datetime64[D]",
+        )
 
     def get_stock(self) -> List[Dict[str, Any]]:
         """
@@ -70,10 +94,10 @@ class InventoryDBTool(BaseTool):
         -------------------------------------
         Return the inventory record for a given item_id. Raises KeyError if not found.
         """
-        for item in self._inventory:
-            if item["item_id"] == item_id:
-                return item
-        raise KeyError(f"Item with ID '{item_id}' not found in inventory.")
+        try:
+            return self._inventory[self._id_to_pos[item_id]]
+        except KeyError:
+            raise KeyError(f"Item with ID '{item_id}' not found in inventory.") from None
 
     def update_stock(self, item_id: str, new_quantity: int) -> bool:
         """
@@ -84,10 +108,12 @@ class InventoryDBTool(BaseTool):
         """
         try:
             item = self.get_item_by_id(item_id)
-            item["quantity"] = new_quantity
-            return True
-        except KeyError:
+            quantity = self._to_quantity(new_quantity)
+        except (KeyError, TypeError, ValueError, OverflowError):
             return False
+        self._qty[self._id_to_pos[item_id]] = quantity
+        item["quantity"] = quantity
+        return True
 
     def record_usage(self, item_id: str, used_amount: int) -> bool:
         """
@@ -98,11 +124,29 @@ class InventoryDBTool(BaseTool):
         """
         try:
             item = self.get_item_by_id(item_id)
-            item["quantity"] -= used_amount
-            item["usage_history"].append(used_amount)
-            return True
-        except KeyError:
+            quantity = self._to_quantity(item["quantity"] - used_amount)
+        except (KeyError, TypeError, ValueError, OverflowError):
             return False
+        self._qty[self._id_to_pos[item_id]] = quantity
+        item["quantity"] = quantity
+        item["usage_history"].append(used_amount)
+        return True
+
+    @staticmethod
+    def _to_quantity(value: Any) -> int:
+        """
+        _to_quantity(value) -> int
+        --------------------------
+        Validate a new stock quantity before it is written, so the item dict
+        and the int64 _qty column always hold the same value. Raises
+        ValueError for non-whole numbers and OverflowError outside int64.
+        """
+        quantity = int(value)
+        if quantity != value:
+            raise ValueError(f"Quantity {value!r} is not a whole number.")
+        if not _INT64_MIN <= quantity <= _INT64_MAX:
+            raise OverflowError(f"Quantity {value!r} does not fit in int64.")
+        return quantity
 
     def list_low_stock(self) -> List[Dict[str, Any]]:
         """
@@ -110,11 +154,7 @@ class InventoryDBTool(BaseTool):
         ------------------------------
         Returns a list of items whose quantity is below reorder_threshold.
         """
-        low_stock_items = []
-        for item in self._inventory:
-            if item["quantity"] < item["reorder_threshold"]:
-                low_stock_items.append(item)
-        return low_stock_items
+        return [self._inventory[i] for i in np.flatnonzero(self._qty < self._threshold)]
 
     def list_expiring_soon(self, within_days: int = 30) -> List[Dict[str, Any]]:
         """
@@ -122,9 +162,7 @@ class InventoryDBTool(BaseTool):
         --------------------------------------------------
         Returns items whose expiry_date is within the next 'within_days' days.
         """
-        upcoming = []
-        cutoff = datetime.now() + timedelta(days=within_days)
-        for item in self._inventory:
-            if item["expiry_date"] <= cutoff:
-                upcoming.append(item)
-        return upcoming
+        # Day-resolution cutoff to match the datetime64[D] expiry column, so the
+        # comparison needs no unit conversion.
+        cutoff = np.datetime64((datetime.now() + timedelta(days=within_days)).date())
+        return [self._inventory[i] for i in np.flatnonzero(self._expiry <= cutoff)]